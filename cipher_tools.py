@@ -2,7 +2,29 @@
 # Description: A set of functions for analysis and decryption of basic ciphers
 # Created: 07-07-2019
 # Created by: Benjamin M. Singleton
-import math
+import string
+from collections import Counter
+
+
+def get_rotation_table(rotate_by):
+    """
+    Builds a translation table, suitable for str.translate, that performs a
+    Caesar shift of rotate_by spaces on upper and lowercase letters and leaves
+    everything else untouched.
+    :param rotate_by: The number of spaces in the alphabet to shift letters by.
+    :type rotate_by: int
+    :return: The translation table.
+    :rtype: dict
+    """
+    rotate_by %= 26
+    lower = string.ascii_lowercase
+    upper = string.ascii_uppercase
+    return str.maketrans(lower + upper,
+                         lower[rotate_by:] + lower[:rotate_by] + upper[rotate_by:] + upper[:rotate_by])
+
+
+# one translation table for each of the 26 possible shifts, indexed by shift
+ROTATION_TABLES = [get_rotation_table(x) for x in range(26)]
 
 
 def rotate_letter(letter, rotate_by):
@@ -16,13 +38,7 @@ def rotate_letter(letter, rotate_by):
     :return: The shifted letter.
     :rtype: str
     """
-    if ord(letter) in range(ord('a'), ord('z') + 1):
-        base = ord('a')
-    elif ord(letter) in range(ord('A'), ord('Z')+1):
-        base = ord('A')
-    else:
-        return letter
-    return str(chr(((ord(letter) - base + rotate_by) % 26) + base))
+    return letter.translate(ROTATION_TABLES[rotate_by % 26])
 
 
 def rotate(plaintext, rotate_by):
@@ -36,13 +52,7 @@ def rotate(plaintext, rotate_by):
     :return: The encrypted text.
     :rtype: str
     """
-    rotated = list()
-    rotated_text = str()
-    for x in plaintext:
-        rotated.append(rotate_letter(x, rotate_by))
-    for each in rotated:
-        rotated_text += each
-    return rotated_text
+    return plaintext.translate(ROTATION_TABLES[rotate_by % 26])
 
 
 def get_all_rotations(crypt_text):
@@ -53,7 +63,7 @@ def get_all_rotations(crypt_text):
     :return: The list of strings of shifted text.
     :rtype: list
     """
-    rotations = [x for x in [rotate(crypt_text, y) for y in range(26)]]
+    rotations = [rotate(crypt_text, y) for y in range(26)]
     return rotations
 
 
@@ -71,24 +81,21 @@ def vigenere_encode(text, key):
     :return:
     :rtype: str
     """
+    assert len(key) > 0
     assert len(text) >= len(key)
-    crypt_text = str()
-    crypt_text_list = list()
-    # first we create the key text, a list that tells the number of places to rotate a given letter in the plaintext
+    crypt_text_list = list(text)
+    # first we turn the key into the number of places to rotate by for each
+    # position in the key
     key = key.lower()
-    key_list = [x for x in key]
-    key_list = [(ord(x) - ord('a')) for x in key_list]  # a = 0, b = 1...
-    key_text_list = key_list * math.floor(len(text)/len(key))
-    remaining = key_list[0:len(text) % len(key)]
-    for each in remaining:
-        key_text_list.append(each)
-    # second, we rotate one letter of plaintext at a time, according to our key text
-    for x in range(len(text)):
-        crypt_text_list.append(rotate_letter(text[x], key_text_list[x]))
+    key_list = [(ord(x) - ord('a')) % 26 for x in key]  # a = 0, b = 1...
+    # second, every letter of plaintext at the same position modulo the key
+    # length is rotated by the same amount, so we rotate each such column of
+    # text at once and write it back into its positions
+    for index in range(len(key_list)):
+        column = text[index::len(key_list)]
+        crypt_text_list[index::len(key_list)] = column.translate(ROTATION_TABLES[key_list[index]])
     # third, we convert the list of encrypted letters to a string
-    for each in crypt_text_list:
-        crypt_text += each
-    return crypt_text
+    return ''.join(crypt_text_list)
 
 
 def vigenere_decode(crypt_text, key):
@@ -103,29 +110,86 @@ def vigenere_decode(crypt_text, key):
     :return:
     :rtype: str
     """
+    assert len(key) > 0
     assert len(crypt_text) >= len(key)
-    key = key.lower()
-    decryption_key = str()
-    # mirror the key around a. (that is, a = a, b = z, c = y, etc)
-    for each in key:
-        decryption_key += str(chr((26 - (ord(each) - ord('a'))) % 26 + ord('a')))
-    print(decryption_key)
+    # mirror the key around a. (that is, a = a, b = z, c = y, etc) every
+    # character is inverted by its offset from a, the same way vigenere_encode
+    # reads it, so keys with non-letters still decode what they encoded
+    decryption_key = ''.join(chr(-(ord(x) - ord('a')) % 26 + ord('a')) for x in key.lower())
     # encoding with the inverted key is the same as decoding
     return vigenere_encode(crypt_text, decryption_key)
 
 
 def get_letter_counts(text):
+    """
+    Counts the occurrences of each letter of the alphabet in text, ignoring
+    case.
+    :param text: The text to count letters in.
+    :type text: str
+    :return: The dict whose keys are the uppercase letters A-Z and whose
+    values are the number of times they occur in text.
+    :rtype: dict
+    """
+    # uppercasing first also folds characters like 'ſ' and 'ß' into the
+    # letters they stand for. str.count scans the text in C, so 26 scans beat
+    # one pass in Python
     text = text.upper()
     counts = dict()
-    for x in range(ord('A'), ord('Z')+1):
-        counts[chr(x)] = 0
-    for each in text:
-        if ord(each) not in range(ord('A'), ord('Z')+1):
-            continue
-        counts[each] += 1
+    for letter in string.ascii_uppercase:
+        counts[letter] = text.count(letter)
     return counts
 
 
+# relative frequency of each letter in English text
+ENGLISH_LETTER_FREQUENCIES = {
+    'A': 0.08167, 'B': 0.01492, 'C': 0.02782, 'D': 0.04253, 'E': 0.12702,
+    'F': 0.02228, 'G': 0.02015, 'H': 0.06094, 'I': 0.06966, 'J': 0.00153,
+    'K': 0.00772, 'L': 0.04025, 'M': 0.02406, 'N': 0.06749, 'O': 0.07507,
+    'P': 0.01929, 'Q': 0.00095, 'R': 0.05987, 'S': 0.06327, 'T': 0.09056,
+    'U': 0.02758, 'V': 0.00978, 'W': 0.02360, 'X': 0.00150, 'Y': 0.01974,
+    'Z': 0.00074
+}
+
+
+def get_chi_squared(text):
+    """
+    Measures how far the letter frequencies of text are from those of English
+    using the chi-squared statistic. Non-letters are ignored.
+    :param text: The text to score.
+    :type text: str
+    :return: The chi-squared statistic. Lower means more English-like, and
+    text with no letters at all scores infinity.
+    :rtype: float
+    """
+    counts = get_letter_counts(text)
+    total = sum(counts.values())
+    if total == 0:
+        return float('inf')
+    chi_squared = 0.0
+    for letter, frequency in ENGLISH_LETTER_FREQUENCIES.items():
+        expected = total * frequency
+        chi_squared += (counts[letter] - expected) ** 2 / expected
+    return chi_squared
+
+
+def get_index_of_coincidence(text):
+    """
+    Computes the index of coincidence of text, the chance that two letters
+    picked at random from it are the same. English text scores about 0.066,
+    while evenly spread letters score about 0.038. Non-letters are ignored.
+    :param text: The text to measure.
+    :type text: str
+    :return: The index of coincidence, or 0.0 for text with fewer than two
+    letters.
+    :rtype: float
+    """
+    counts = get_letter_counts(text)
+    total = sum(counts.values())
+    if total < 2:
+        return 0.0
+    return sum(x * (x - 1) for x in counts.values()) / (total * (total - 1))
+
+
 def sort_dict_of_str_to_int(unsorted_dict):
     """
     Sorts a dictionary whose keys are strings and values are integers by their
@@ -152,13 +216,11 @@ def substitute_alphabet(text, origin_to_destination):
     :return: The resulting text, encrypted with the cipher.
     :rtype: str
     """
-    updated_text = str()
-    for letter in text:
-        if letter not in origin_to_destination.keys():
-            updated_text += letter
-        else:
-            updated_text += origin_to_destination[letter]
-    return updated_text
+    # text is substituted one letter at a time, so keys longer than one
+    # character can never match and str.maketrans would reject them. letters
+    # without an entry in the table are left as they are.
+    table = {x: y for x, y in origin_to_destination.items() if len(x) == 1}
+    return text.translate(str.maketrans(table))
 
 
 def get_n_graphs(words, n=2):
@@ -173,16 +235,8 @@ def get_n_graphs(words, n=2):
     number of times they occur in words.
     :rtype: dict
     """
-    n_graphs = dict()
-    for each_word in words:
-        index = 0
-        while index + n <= len(each_word):
-            this_digraph = each_word[index:index + n]
-            if this_digraph not in n_graphs.keys():
-                n_graphs[this_digraph] = 1
-            else:
-                n_graphs[this_digraph] += 1
-            index += 1
+    n_graphs = Counter(each_word[index:index + n] for each_word in words
+                       for index in range(len(each_word) - n + 1))
     return n_graphs
 
 
@@ -200,8 +254,9 @@ def get_n_graphs_by_count(words, n=2):
     occur.
     :rtype: list
     """
-    filtered = filter(lambda x: x[1] > 1, get_n_graphs(words, n).items())
-    n_graphs = sorted(filtered, key=lambda x: x[1], reverse=True)
+    # most_common already sorts by count, so we only need to drop the n-graphs
+    # that occur once
+    n_graphs = [x for x in get_n_graphs(words, n).most_common() if x[1] > 1]
     return n_graphs
 
 
@@ -217,16 +272,7 @@ def get_n_graph_prefixes(words, n=2):
     number of times they occur in words.
     :rtype: dict
     """
-    n_graphs = dict()
-    for each_word in words:
-        index = 0
-        if index + n > len(each_word):
-            continue
-        this_digraph = each_word[index:index + n]
-        if this_digraph not in n_graphs.keys():
-            n_graphs[this_digraph] = 1
-        else:
-            n_graphs[this_digraph] += 1
+    n_graphs = Counter(each_word[:n] for each_word in words if len(each_word) >= n)
     return n_graphs
 
 
@@ -242,16 +288,7 @@ def get_n_graph_suffixes(words, n=2):
     number of times they occur in words.
     :rtype: dict
     """
-    n_graphs = dict()
-    for each_word in words:
-        index = len(each_word) - n
-        if index < 0 or index > len(each_word):
-            continue
-        this_digraph = each_word[index:index + n]
-        if this_digraph not in n_graphs.keys():
-            n_graphs[this_digraph] = 1
-        else:
-            n_graphs[this_digraph] += 1
+    n_graphs = Counter(each_word[len(each_word) - n:] for each_word in words if len(each_word) >= n)
     return n_graphs
 
 
@@ -269,8 +306,7 @@ def get_n_graph_prefixes_by_count(words, n=2):
     occur.
     :rtype: list
     """
-    filtered = filter(lambda x: x[1] > 1, get_n_graph_prefixes(words, n).items())
-    n_graphs = sorted(filtered, key=lambda x: x[1], reverse=True)
+    n_graphs = [x for x in get_n_graph_prefixes(words, n).most_common() if x[1] > 1]
     return n_graphs
 
 
@@ -288,12 +324,11 @@ def get_n_graph_suffixes_by_count(words, n=2):
     occur.
     :rtype: list
     """
-    filtered = filter(lambda x: x[1] > 1, get_n_graph_suffixes(words, n).items())
-    n_graphs = sorted(filtered, key=lambda x: x[1], reverse=True)
+    n_graphs = [x for x in get_n_graph_suffixes(words, n).most_common() if x[1] > 1]
     return n_graphs
 
 
-def naive_substitution(sorted_counts):
+def naive_substitution(sorted_counts, verbose=False):
     """
     Given a list of lists containing letters (sorted by descending frequency)
     and their counts, produces a dict mapping encrypted text letters to
@@ -302,6 +337,8 @@ def naive_substitution(sorted_counts):
     :param sorted_counts: A list of lists, presorted by the second subelement
     in each element. E.g., [['E', 15], ['T', 13]...]
     :type sorted_counts: list
+    :param verbose: Whether to print the resulting substitutions.
+    :type verbose: bool
     :return: The dictionary/lookup table to decipher the text. Keys are strings
     and so are values.
     :rtype: dict
@@ -314,8 +351,9 @@ def naive_substitution(sorted_counts):
         if sorted_counts[index][1] == 0:
             break
         substitution_cipher[sorted_counts[index][0]] = letters_by_english_frequency[index]
-    for each_key in substitution_cipher.keys():
-        print(each_key + ' = ' + substitution_cipher[each_key])
+    if verbose:
+        for each_key in substitution_cipher.keys():
+            print(each_key + ' = ' + substitution_cipher[each_key])
     return substitution_cipher
 
 
@@ -8,69 +8,54 @@
 #
 # Created: 07-11-2019
 # Created by: Benjamin M. Singleton
-import copy
+from itertools import zip_longest
 
 
 def form_rectangle_horizontally(text, width, length):
-    rectangle = [list() for x in range(length)]
-    for y in range(length):
-        rectangle[y] = [x for x in text[(y*width):(y+1)*width]]
+    rectangle = [list(text[(y*width):(y+1)*width]) for y in range(length)]
     return rectangle
 
 
 def form_rectangle_vertically(text, width, length):
-    rectangle = [['' for x in range(width)] for y in range(length)]
-    for x in range(width):
-        for y in range(length):
-            rectangle[y][x] = text[y+x*width:y+(x*width)+1]
+    # a slice step can't be zero, and a rectangle with no width has empty rows
+    if width == 0:
+        return [list() for y in range(length)]
+    rectangle = list()
+    for y in range(length):
+        # row y holds every width-th letter, starting from the y-th letter
+        row = list(text[y::width][:width])
+        rectangle.append(row + [''] * (width - len(row)))
     return rectangle
 
 
 def unravel_rectangle_horizontally(rectangle):
-    text = str()
-    for each_row in rectangle:
-        for each_letter in each_row:
-            text += each_letter
-    return text
+    return ''.join(map(''.join, rectangle))
 
 
 def unravel_rectangle_vertically(rectangle):
-    text = str()
-    width = len(rectangle[0])
-    for column in range(width):
-        for row in range(len(rectangle)):
-            text += rectangle[row][column]
-    return text
+    # a short last row is padded out rather than cutting every column short
+    return ''.join(map(''.join, zip_longest(*rectangle, fillvalue='')))
 
 
 def swap_rows(rectangle, row_1, row_2):
-    temp_row = copy.deepcopy(rectangle[row_1])
-    rectangle[row_1] = rectangle[row_2]
-    rectangle[row_2] = temp_row
+    rectangle[row_1], rectangle[row_2] = rectangle[row_2], rectangle[row_1]
     return rectangle
 
 
 def swap_columns(rectangle, column_1, column_2):
-    for row in range(len(rectangle)):
-        temp_val = copy.deepcopy(rectangle[row][column_1])
-        rectangle[row][column_1] = rectangle[row][column_2]
-        rectangle[row][column_2] = temp_val
+    for row in rectangle:
+        row[column_1], row[column_2] = row[column_2], row[column_1]
     return rectangle
 
 
 def write_to_location_pairs(rectangle, text, locations):
-    index = 0
-    for x, y in locations:
-        rectangle[y][x] = text[index]
-        index += 1
+    for (x, y), letter in zip(locations, text):
+        rectangle[y][x] = letter
     return rectangle
 
 
 def read_from_location_pairs(rectangle, locations):
-    text = str()
-    for x, y in locations:
-        text += rectangle[y][x]
-    return text
+    return ''.join(rectangle[y][x] for x, y in locations)
 
 
 def get_spiral(width, length, clockwise=True, inward=True):
@@ -93,51 +78,25 @@ def get_spiral(width, length, clockwise=True, inward=True):
     locations = list()
     # it's difficult to predict the number of locations in a spiral, so we just
     # keep trying to spiral until we run out of locations
-    old_num_locations = -1
-    while len(locations) > old_num_locations:
-        this_rotation = list()
-        old_num_locations = len(locations)
-        # save the top left-to-right row
-        x_positions = [x for x in range(full_rotations, (width - full_rotations))]
-        current_y = full_rotations
-        for each_x in x_positions:
-            this_rotation.append(list())
-            this_rotation[-1].append(each_x)
-            this_rotation[-1].append(current_y)
-        # save the right top-to-bottom column
-        y_positions = [y for y in range(full_rotations + 1, (length - full_rotations))]
-        current_x = width - full_rotations - 1
-        for each_y in y_positions:
-            this_rotation.append(list())
-            this_rotation[-1].append(current_x)
-            this_rotation[-1].append(each_y)
-        # save the bottom right-to-left row
-        x_positions = [x for x in range(full_rotations, (width - full_rotations) - 1)]
-        x_positions = sorted(x_positions, reverse=True)
-        current_y = length - full_rotations - 1
-        for each_x in x_positions:
-            this_rotation.append(list())
-            this_rotation[-1].append(each_x)
-            this_rotation[-1].append(current_y)
-        # save the left bottom-to-top column
-        y_positions = [y for y in range(full_rotations + 1, (length - full_rotations) - 1)]
-        y_positions = sorted(y_positions, reverse=True)
-        current_x = full_rotations
-        for each_y in y_positions:
-            this_rotation.append(list())
-            this_rotation[-1].append(current_x)
-            this_rotation[-1].append(each_y)
+    while True:
+        top = full_rotations
+        bottom = length - full_rotations - 1
+        left = full_rotations
+        right = width - full_rotations - 1
+        # the top left-to-right row, the right top-to-bottom column, the
+        # bottom right-to-left row and the left bottom-to-top column
+        this_rotation = [[x, top] for x in range(left, right + 1)]
+        this_rotation += [[right, y] for y in range(top + 1, bottom + 1)]
+        this_rotation += [[x, bottom] for x in range(right - 1, left - 1, -1)]
+        this_rotation += [[left, y] for y in range(bottom - 1, top, -1)]
+        if not this_rotation:
+            break
         # the first element visited in a rotation is the same whether traversed
         # clockwise or counter-clockwise, but the rest of the order is
         # reversed.
-        if len(this_rotation) > 1 and not clockwise:
-            this_rotation.reverse()
-            temp_rotation = list()
-            temp_rotation.append(this_rotation[-1])
-            temp_rotation += this_rotation[0:-1]
-            this_rotation = temp_rotation
-        for each_pair in this_rotation:
-            locations.append(each_pair)
+        if not clockwise:
+            this_rotation = this_rotation[:1] + this_rotation[:0:-1]
+        locations += this_rotation
         # next iteration
         full_rotations += 1
     # if we're spiraling inwards instead of outwards, we just need to reverse
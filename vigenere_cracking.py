@@ -2,8 +2,9 @@
 # Description: A set of functions for analysis and cracking of vigenere ciphers
 # Created: 07-17-2019
 # Created by: Benjamin M. Singleton
-from cipher_tools import vigenere_encode, vigenere_decode
-import copy
+from cipher_tools import vigenere_encode, vigenere_decode, get_all_rotations, get_chi_squared, get_index_of_coincidence
+from collections import defaultdict
+from functools import lru_cache
 
 
 def find_matches(text, pattern, candidate_locations):
@@ -19,12 +20,9 @@ def find_matches(text, pattern, candidate_locations):
     :return: The list of indices where pattern occurs in text.
     :rtype: list
     """
-    matches = list()
-    for each in candidate_locations:
-        if each + len(pattern) > len(text):
-            continue
-        if text[each:each+len(pattern)] == pattern:
-            matches.append(each)
+    # startswith compares in place, without building a slice of text for
+    # every candidate, and fails for candidates too close to the end of text
+    matches = [each for each in candidate_locations if text.startswith(pattern, each)]
     return matches
 
 
@@ -40,40 +38,46 @@ def get_pattern_distances(patterns):
     :rtype: list
     """
     pattern_distances = list()
-    for each_paterrn in patterns.keys():
+    for indices in patterns.values():
         # given a set of locations of a pattern, find the difference between
         # each location, and save this difference if it's consistent, otherwise
-        # throw it out.
-        indices = patterns[each_paterrn]
-        a = patterns[each_paterrn][:-1]
-        b = indices[1:]
-        deltas = set(map(int.__sub__, b, a))
-        if len(deltas) > 1:
-            continue
-        pattern_distances.append(list(deltas)[0])
+        # throw it out. we stop at the first difference that doesn't match.
+        delta = indices[1] - indices[0]
+        if all(b - a == delta for a, b in zip(indices[1:], indices[2:])):
+            pattern_distances.append(delta)
     return list(set(pattern_distances))
 
 
+@lru_cache(maxsize=None)
 def get_factors(number):
     """
-    Returns a list of the factors of a given number, in ascending order.
+    Returns a tuple of the factors of a given number, in ascending order.
+    Results are cached, since the Kasiski test factors the same distances
+    over and over.
     :param number: The number to factor.
     :type number: int
-    :return: The list of factors (int) of number.
-    :rtype: list
+    :return: The tuple of factors (int) of number.
+    :rtype: tuple
     """
-    factors = list()
-    for i in range(1, number+1):
+    small_factors = list()
+    large_factors = list()
+    # factors come in pairs (i, number / i), so we only need to search up to
+    # the square root of number
+    i = 1
+    while i * i <= number:
         if number % i == 0:
-            factors.append(i)
-    return factors
+            small_factors.append(i)
+            if i != number // i:
+                large_factors.append(number // i)
+        i += 1
+    return tuple(small_factors + large_factors[::-1])
 
 
 def maximize_patterns(crypt_text, patterns, maximum_pattern_length):
     """
     Looks at all of the known patterns in the dictionary of patterns and match
     locations, tries to find patterns that are one character longer, and
-    continues recursively until no more patterns are found.
+    continues until no more patterns are found.
     :param crypt_text: The text to search for patterns in.
     :type crypt_text: str
     :param patterns: The dictionary whose keys are the repeating patterns
@@ -85,23 +89,27 @@ def maximize_patterns(crypt_text, patterns, maximum_pattern_length):
     whose values are the lists of their occurrences in crypt_text.
     :rtype: dict
     """
-    changed = False
-    new_patterns = dict()
-    for each_pattern in patterns.keys():
-        tentative_pattern_length = len(each_pattern) + 1
-        if tentative_pattern_length > maximum_pattern_length:
-            continue
-        for each_occurence in range(len(patterns[each_pattern])):
-            index = patterns[each_pattern][each_occurence]
-            tentative_pattern = crypt_text[index:index+tentative_pattern_length]
-            matches = find_matches(crypt_text, tentative_pattern, patterns[each_pattern])
-            if len(matches) > 1:
-                new_patterns[tentative_pattern] = matches
-                changed = True
-    if changed:
-        recursive_patterns = maximize_patterns(crypt_text, new_patterns, maximum_pattern_length)
-        for each_pattern in recursive_patterns.keys():
-            patterns[each_pattern] = recursive_patterns[each_pattern]
+    text_length = len(crypt_text)
+    new_patterns = patterns
+    while new_patterns:
+        current_patterns = new_patterns
+        new_patterns = dict()
+        for each_pattern, locations in current_patterns.items():
+            tentative_pattern_length = len(each_pattern) + 1
+            if tentative_pattern_length > maximum_pattern_length:
+                continue
+            # a longer pattern can only occur where its prefix does, so we
+            # group the prefix's locations by the character that follows them
+            extensions = defaultdict(list)
+            for index in locations:
+                # occurrences at the very end of crypt_text can't be extended
+                if index + tentative_pattern_length > text_length:
+                    continue
+                extensions[crypt_text[index:index+tentative_pattern_length]].append(index)
+            for tentative_pattern, matches in extensions.items():
+                if len(matches) > 1:
+                    new_patterns[tentative_pattern] = matches
+        patterns.update(new_patterns)
     return patterns
 
 
@@ -118,24 +126,11 @@ def initialize_patterns(crypt_text, minimum_pattern_length=3):
     function.
     :rtype: dict
     """
-    patterns = dict()
-    for index in range(len(crypt_text)):
-        if index + minimum_pattern_length > len(crypt_text):
-            break
-        current_pattern = crypt_text[index:index+minimum_pattern_length]
-        if current_pattern in patterns.keys():
-            patterns[current_pattern].append(index)
-        else:
-            patterns[current_pattern] = list()
-            patterns[current_pattern].append(index)
+    patterns = defaultdict(list)
+    for index in range(len(crypt_text) - minimum_pattern_length + 1):
+        patterns[crypt_text[index:index+minimum_pattern_length]].append(index)
     # remove any patterns that only occur once
-    copy_patterns = dict()
-    patterns = sorted(patterns.items(), key=lambda x: len(x[1]), reverse=True)
-    for each_pair in patterns:
-        if len(each_pair[1]) <= 1:
-            break
-        copy_patterns[each_pair[0]] = each_pair[1]
-    return copy_patterns
+    return {pattern: locations for pattern, locations in patterns.items() if len(locations) > 1}
 
 
 def remove_redundant_patterns(patterns):
@@ -151,47 +146,86 @@ def remove_redundant_patterns(patterns):
     :return: The resulting dict with all redundancies removed.
     :rtype: dict
     """
-    changed = False
-    keys_to_delete = list()
-    non_redundant_patterns = copy.deepcopy(patterns)
-    for suspect_key in non_redundant_patterns.keys():
-        for larger_key in non_redundant_patterns.keys():
-            if len(suspect_key) >= len(larger_key):
-                continue
-            if suspect_key not in larger_key:
-                continue
-            if len(non_redundant_patterns[suspect_key]) != len(non_redundant_patterns[larger_key]):
-                continue
-            difference = larger_key.index(suspect_key)
-            # if suspect_key is NOT at the beginning of larger_key, adjust the
-            # indices accordingly
-            if difference > 0:
-                adjusted = [x - difference for x in non_redundant_patterns[suspect_key]]
-            elif difference == 0:
-                adjusted = non_redundant_patterns[suspect_key]
-            else:
-                assert 2 + 2 == 5, "Someone changed the code to examine larger_key instances that don't contain suspect_key!"
-            if adjusted == non_redundant_patterns[larger_key]:
-                # mark the suspect key for deletion
-                keys_to_delete.append(suspect_key)
-                changed = True
-                # we don't need to see if suspect_key perfectly coincides with
-                # any other larger_keys if it does with one of them.
+    # index every pattern by its exact list of locations
+    patterns_by_locations = defaultdict(list)
+    for each_pattern, locations in patterns.items():
+        patterns_by_locations[tuple(locations)].append(each_pattern)
+    maximum_pattern_length = max(map(len, patterns), default=0)
+    non_redundant_patterns = dict()
+    for suspect_key, locations in patterns.items():
+        suspect_length = len(suspect_key)
+        redundant = False
+        # if suspect_key starts difference characters into a larger_key, the
+        # larger_key's locations are suspect_key's shifted back by difference
+        for difference in range(maximum_pattern_length - suspect_length + 1):
+            shifted = tuple(x - difference for x in locations)
+            for larger_key in patterns_by_locations.get(shifted, ()):
+                if len(larger_key) > suspect_length and larger_key.find(suspect_key) == difference:
+                    redundant = True
+                    break
+            if redundant:
                 break
-    if changed:
-        for each_key in keys_to_delete:
-            del non_redundant_patterns[each_key]
-        non_redundant_patterns = remove_redundant_patterns(non_redundant_patterns)
+        if not redundant:
+            non_redundant_patterns[suspect_key] = locations
     return non_redundant_patterns
 
 
-def brute_force_vigenere_key(crypt_text, patterns, key_length):
-    candidate_list = list()
-    for key in candidate_list:
-        possible_solution = vigenere_decode(crypt_text, key)
-        assert 2 + 2 == 5
-        return key
-    return -1
+def find_vigenere_key(crypt_text, key_length):
+    """
+    Finds the most likely key of key_length letters for crypt_text. Every
+    key_length-th letter of crypt_text was shifted by the same letter of the
+    key, so each of those columns is solved on its own as a Caesar cipher, by
+    picking the shift whose output is closest to English letter frequencies.
+    :param crypt_text: The text encrypted with a vigenere cipher.
+    :type crypt_text: str
+    :param key_length: The length of the key, in letters.
+    :type key_length: int
+    :return: The most likely key.
+    :rtype: str
+    """
+    key = list()
+    for index in range(key_length):
+        column = crypt_text[index::key_length]
+        scores = [get_chi_squared(x) for x in get_all_rotations(column)]
+        # rotating forward by best_rotation undoes a shift of 26 - best_rotation
+        best_rotation = scores.index(min(scores))
+        key.append(chr((26 - best_rotation) % 26 + ord('a')))
+    return ''.join(key)
+
+
+def choose_vigenere_key(crypt_text, possible_key_lengths):
+    """
+    Picks the most likely key for crypt_text out of the possible key lengths.
+    Scoring the decrypted text would favour the longest length, since more
+    columns can be fitted more closely to English. Instead, each length is
+    judged by the mean index of coincidence of its columns, which is close to
+    English only when every column was shifted by a single key letter.
+    Multiples of the real length score about as well as the real length, so
+    the shortest length scoring within a tenth of the best one wins, and any
+    key that merely repeats a shorter candidate key is dropped.
+    :param crypt_text: The text encrypted with a vigenere cipher.
+    :type crypt_text: str
+    :param possible_key_lengths: The key lengths to consider.
+    :type possible_key_lengths: list
+    :return: The most likely key, or -1 if there are no key lengths.
+    :rtype: str
+    """
+    candidate_keys = list()
+    scores = list()
+    for each_length in sorted(set(possible_key_lengths)):
+        key = find_vigenere_key(crypt_text, each_length)
+        if any(key == x * (each_length // len(x)) for x in candidate_keys):
+            continue
+        columns = [crypt_text[x::each_length] for x in range(each_length)]
+        candidate_keys.append(key)
+        scores.append(sum(map(get_index_of_coincidence, columns)) / each_length)
+    if not candidate_keys:
+        return -1
+    # candidate_keys are in ascending order of length
+    best_score = max(scores)
+    for key, score in zip(candidate_keys, scores):
+        if score >= 0.9 * best_score:
+            return key
 
 
 def vigenere_kasiski_test(crypt_text, minimum_pattern_length=3, maximum_pattern_length=6):
@@ -201,18 +235,34 @@ def vigenere_kasiski_test(crypt_text, minimum_pattern_length=3, maximum_pattern_
     patterns = remove_redundant_patterns(patterns)
     # find the periods of all patterns
     pattern_distances = list(set(get_pattern_distances(patterns)))
-    # compute possible key lengths from above
+    if not pattern_distances:
+        return list()
+    # compute possible key lengths from above, as the intersection of the
+    # factors of every distance
     factors_of_distances = [get_factors(x) for x in pattern_distances]
-    # get the intersections of all sets of factors
-    possible_key_lengths = factors_of_distances[0]
-    for each_set in factors_of_distances[1:]:
-        # possible_key_lengths = intersection of possible_key_lengths and each_set
-        possible_key_lengths = list(set(possible_key_lengths) & set(each_set))
+    possible_key_lengths = set(factors_of_distances[0]).intersection(*factors_of_distances[1:])
     possible_key_lengths = sorted(possible_key_lengths, reverse=True)
     return possible_key_lengths
 
 
 def crack_vigenere_cipher(crypt_text, minimum_pattern_length, maximum_pattern_length, minimum_key_size, maximum_key_size):
+    """
+    Cracks a vigenere cipher by finding possible key lengths with the Kasiski
+    test, solving for the best key of each length, and picking between them
+    with choose_vigenere_key.
+    :param crypt_text: The text encrypted with a vigenere cipher.
+    :type crypt_text: str
+    :param minimum_pattern_length: The shortest repeating pattern to look for.
+    :type minimum_pattern_length: int
+    :param maximum_pattern_length: The longest repeating pattern to look for.
+    :type maximum_pattern_length: int
+    :param minimum_key_size: The shortest key length to consider.
+    :type minimum_key_size: int
+    :param maximum_key_size: The longest key length to consider.
+    :type maximum_key_size: int
+    :return: The most likely key, or -1 if no key length fits.
+    :rtype: str
+    """
     # use the kasiski test to find possible key lengths for the crypt_text
     possible_key_lengths = vigenere_kasiski_test(crypt_text, minimum_pattern_length, maximum_pattern_length)
     # pare down list of possible key lengths according to specified maximums and minimums
@@ -224,13 +274,9 @@ def crack_vigenere_cipher(crypt_text, minimum_pattern_length, maximum_pattern_le
             break
         temp_list.append(each)
     possible_key_lengths = temp_list
-    # find the best-fitting key for each possible key length
-    for each_length in possible_key_lengths:
-        pass
-    # we've narrowed the candidate keys down to one key for each possible key
-    # length, so now we select the best out of this list
-    print('This functionality has not been implemented yet.')
-    return -1
+    # find the best-fitting key for each possible key length, and select the
+    # best out of those
+    return choose_vigenere_key(crypt_text, possible_key_lengths)
 
 
 def test_vigenere_cracking():
@@ -253,6 +299,26 @@ def test_vigenere_cracking():
     possible_key_lengths = vigenere_kasiski_test(crypt_text, minimum_pattern_length=3, maximum_pattern_length=6)
     print('Possible key lengths are:')
     print(possible_key_lengths)
+    # solve for the key column by column on a longer English passage
+    plain_text = ('It was the best of times, it was the worst of times, it was the '
+                  'age of wisdom, it was the age of foolishness, it was the epoch '
+                  'of belief, it was the epoch of incredulity, it was the season of '
+                  'Light, it was the season of Darkness, it was the spring of hope, '
+                  'it was the winter of despair.').lower()
+    for key in ['lemon', 'cat', 'secret']:
+        crypt_text = vigenere_encode(plain_text, key)
+        assert find_vigenere_key(crypt_text, len(key)) == key
+    # the real key length must beat both multiples of it and unrelated lengths
+    crypt_text = vigenere_encode(plain_text, 'lemon')
+    assert choose_vigenere_key(crypt_text, [24, 12, 5]) == 'lemon'
+    assert choose_vigenere_key(crypt_text, [10, 5]) == 'lemon'
+    crypt_text = vigenere_encode(plain_text, 'cat')
+    assert choose_vigenere_key(crypt_text, [6, 3]) == 'cat'
+    # the kasiski test finds [6, 3] here. 1 divides every distance, so
+    # single-letter keys are ruled out
+    cracked_key = crack_vigenere_cipher(crypt_text, 3, 6, 2, 10)
+    assert cracked_key == 'cat'
+    print('Cracked key is ' + cracked_key)
 
 
 if __name__ == '__main__':